@@ -19,6 +19,10 @@ class EventKind(Enum):
     tile_created = 1
     tile_updated = 2
     tile_removed = 3
+    # Sent once by the Board at the end of each whole move, for
+    # listeners that care about aggregate state (scores, automated
+    # players) rather than individual tile animations.
+    board_updated = 4
 
 
 class GameEvent(object):
@@ -46,7 +50,13 @@ class GameListener(object):
 class GameElement(object):
     """Base class for game elements, especially to support
     depiction through Model-View-Controller.
+
+    Declares __slots__ so that small, numerous elements like
+    tiles are not charged a per-instance __dict__; subclasses
+    that want slotted storage declare their own __slots__,
+    while the others get a __dict__ as usual.
     """
+    __slots__ = ('_listeners',)
 
     def __init__(self):
         """Each game element can have zero or more listeners.
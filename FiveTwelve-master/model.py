@@ -8,42 +8,170 @@ notifications to trigger view updates.
 """
 
 from game_element import GameElement, GameEvent, EventKind
-from typing import List, Tuple, Optional
+from itertools import chain
+from typing import List, NamedTuple, Tuple, Optional
 import random
 
 # Configuration constants
 GRID_SIZE = 4
 
+# ------------------------------------------------------------------
+# Packed row representation.
+#
+# Tile values are always powers of two, so a tile can be encoded
+# in a 4-bit "nibble" holding log2(value), with 0 for an empty
+# space.  A whole row of 4 cells is then one 16-bit integer, and
+# the whole board fits in a single 64-bit integer.  Computing a
+# move on the packed form needs only a few integer operations
+# instead of many Tile-object manipulations; the Tile objects in
+# Board.tiles are kept as a parallel structure so that view
+# components can still be notified of each tile that moved.
+# (A nibble tops out at 2**15.  Like the view's color ramp, we
+# gamble that nobody gets past that.)
+# ------------------------------------------------------------------
+
+ROW_MASK = 0xFFFF
+NIBBLE = 0xF
+
+
+def _slide_row_left(row: int) -> Tuple[int, Tuple[Tuple[int, int, bool], ...]]:
+    """Slide a packed row toward cell 0, merging equal neighbors.
+    A tile that merges stops sliding, but another tile may still
+    slide into it and merge again (same rule as Board.slide).
+
+    Returns the new packed row and a tuple of (src, dst, merged)
+    actions describing how each tile moved, in the order the
+    moves must be applied.
+    """
+    exps = [(row >> (4 * i)) & NIBBLE for i in range(4)]
+    actions = []
+    for col in range(4):
+        if exps[col] == 0:
+            continue
+        pos = col
+        merged = False
+        while pos > 0:
+            ahead = exps[pos - 1]
+            if ahead == 0:
+                exps[pos - 1] = exps[pos]
+                exps[pos] = 0
+                pos -= 1
+            elif ahead == exps[pos]:
+                exps[pos - 1] += 1
+                exps[pos] = 0
+                pos -= 1
+                merged = True
+                break
+            else:
+                break
+        if pos != col:
+            actions.append((col, pos, merged))
+    new_row = exps[0] | (exps[1] << 4) | (exps[2] << 8) | (exps[3] << 12)
+    return new_row, tuple(actions)
 
-class Vec():
+
+def _row_value_sum(row: int) -> int:
+    """Total tile value in a packed row.  An exponent of 0 is an
+    empty space, not a tile of value 1.
+    """
+    total = 0
+    for i in range(4):
+        exp = (row >> (4 * i)) & NIBBLE
+        if exp:
+            total += 1 << exp
+    return total
+
+
+# There are only 65536 possible packed rows, so we run the slide
+# logic once for each of them at import time and index the results
+# thereafter.  A full-board move then costs four table lookups.
+# ROW_SUM gets the same treatment for scoring.  Most rows share
+# one of a few hundred movement patterns, so duplicate action
+# tuples are interned rather than stored 65536 times over.
+MOVE_LEFT: List[int] = []
+MOVE_ACTIONS: List[Tuple[Tuple[int, int, bool], ...]] = []
+ROW_SUM: List[int] = []
+_distinct_actions: dict = {}
+for _row in range(ROW_MASK + 1):
+    _new_row, _actions = _slide_row_left(_row)
+    MOVE_LEFT.append(_new_row)
+    MOVE_ACTIONS.append(_distinct_actions.setdefault(_actions, _actions))
+    ROW_SUM.append(_row_value_sum(_row))
+del _row, _new_row, _actions, _distinct_actions
+
+# Zobrist keys: one random 64-bit number for each (cell, exponent)
+# pair.  A board position hashes to the XOR of the keys of its
+# occupied cells, the standard transposition-table key for
+# game-tree searchers.  A fixed seed keeps hashes stable from run
+# to run, and a private Random instance leaves the generator used
+# by place_tile untouched.
+# Slide trajectories, cached per board shape: every position and
+# unit direction maps to the positions a sliding tile would pass
+# through on its way to the edge, in order.  slide() then walks a
+# prebuilt ray instead of stepping and bounds-checking cell by cell.
+_RAY_CACHE: dict = {}
+
+
+def _rays_for_shape(rows: int, cols: int) -> dict:
+    key = (rows, cols)
+    if key in _RAY_CACHE:
+        return _RAY_CACHE[key]
+    rays = {}
+    for x in range(rows):
+        for y in range(cols):
+            for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+                ray = []
+                new_x, new_y = x + dx, y + dy
+                while 0 <= new_x < rows and 0 <= new_y < cols:
+                    ray.append(Vec(new_x, new_y))
+                    new_x += dx
+                    new_y += dy
+                rays[(x, y, dx, dy)] = tuple(ray)
+    _RAY_CACHE[key] = rays
+    return rays
+
+
+_zobrist_rand = random.Random(512)
+ZOBRIST_KEYS = [[_zobrist_rand.getrandbits(64) for _exp in range(16)]
+                for _cell in range(GRID_SIZE * GRID_SIZE)]
+del _zobrist_rand
+
+
+class Vec(NamedTuple):
     """A Vec is an (x,y) or (row, column) pair that
     represents distance along two orthogonal axes.
     Interpreted as a position, a Vec represents
     distance from (0,0).  Interpreted as movement,
     it represents distance from another position.
     Thus we can add two Vecs to get a Vec.
-    """
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
 
-    def __eq__(self, other: 'Vec') -> bool:
-        return self.x == other.x and self.y == other.y
+    As a NamedTuple, a Vec carries no per-instance
+    __dict__ and gets its (C-implemented) equality
+    from tuple, which matters because board traversal
+    creates a great many of these.
+    """
+    x: int
+    y: int
 
     def __add__(self, other: 'Vec') -> 'Vec':
-        new_x = self.x + other.x
-        new_y = self.y + other.y
-        return Vec(new_x, new_y)
+        # tuple addition would concatenate; we want
+        # elementwise addition.
+        return Vec(self.x + other.x, self.y + other.y)
 
 
 class Tile(GameElement):
     """A slidy numbered thing."""
+    __slots__ = ('row', 'col', 'value', '_updated_event')
 
     def __init__(self, pos: Vec, value: int):
         super().__init__()
         self.row = pos.x
         self.col = pos.y
         self.value = value
+        # A tile_updated event always says "look at this tile
+        # again", so one event object per tile serves every
+        # notification instead of allocating a fresh one per move.
+        self._updated_event = GameEvent(EventKind.tile_updated, self)
 
     def __repr__(self):
         """Not like constructor --- more useful for debugging"""
@@ -58,12 +186,15 @@ class Tile(GameElement):
     def move_to(self, new_pos: Vec):
         self.row = new_pos.x
         self.col = new_pos.y
-        self.notify_all(GameEvent(EventKind.tile_updated, self))
+        self.notify_all(self._updated_event)
 
     def merge(self, other: "Tile"):
-        # This tile incorporates the value of the other tile
+        # This tile incorporates the value of the other tile.
+        # No tile_updated is sent here: every caller moves this
+        # tile into the other's place immediately afterwards, and
+        # the move_to that follows reports the new value and the
+        # new position in a single event.
         self.value = self.value + other.value
-        self.notify_all(GameEvent(EventKind.tile_updated, self))
         # The other tile has been absorbed.  Resistance was futile.
         other.notify_all(GameEvent(EventKind.tile_removed, other))
 
@@ -85,35 +216,50 @@ class Board(GameElement):
             for col in range(cols):
                 row_tiles.append(None)
             self.tiles.append(row_tiles)
+        # The set of currently empty (row, col) positions, kept
+        # up to date as tiles move, so that we never have to scan
+        # the whole grid to find or count empty spaces.
+        self._empty = {(row, col)
+                       for row in range(rows) for col in range(cols)}
+        # The numeric side of the board: one packed integer per
+        # row, 4 bits of log2(value) per cell, maintained in step
+        # with the Tile grid.  The grid holds the objects the view
+        # listens to; the packed rows hold the numbers the move
+        # kernel, score and hash read, with positions implicit in
+        # the indexing.
+        self._packed_rows = [0] * rows
+        self._rays = _rays_for_shape(rows, cols)
+        # Like Tile's cached tile_updated event: the aggregate
+        # "this board changed" event never varies, so reuse one.
+        self._board_updated_event = GameEvent(EventKind.board_updated, self)
 
     def __getitem__(self, pos: Vec) -> Tile:
         return self.tiles[pos.x][pos.y]
 
     def __setitem__(self, pos: Vec, tile: Tile):
         self.tiles[pos.x][pos.y] = tile
+        shift = 4 * pos.y
+        packed = self._packed_rows[pos.x] & ~(NIBBLE << shift)
+        if tile is None:
+            self._empty.add((pos.x, pos.y))
+        else:
+            packed |= (tile.value.bit_length() - 1) << shift
+            self._empty.discard((pos.x, pos.y))
+        self._packed_rows[pos.x] = packed
 
     def _empty_positions(self) -> List[Vec]:
-        # Same as HOWTO.md
-        empties = []
-        for row in range(len(self.tiles)):
-            for col in range(len(self.tiles[row])):
-                if self.tiles[row][col] is None:
-                    empties.append(Vec(row, col))
-        return empties
+        return [Vec(row, col) for row, col in self._empty]
 
     def has_empty(self) -> bool:
-        # use len to check the lengh of em_list
-        # if is not empty, return True
-        em_list = self._empty_positions()
-        if len(em_list) != 0:
-            return True
+        return bool(self._empty)
 
     def place_tile(self, value=None):
         """Place a tile on a randomly chosen empty square."""
-        empties = self._empty_positions()
-        assert len(empties) > 0
-        choice = random.choice(empties)
-        row, col = choice.x, choice.y
+        assert self._empty
+        empties = tuple(self._empty)
+        choice = empties[random.randrange(len(empties))]
+        row, col = choice
+        self._empty.discard(choice)
         if value is None:
             # 0.1 probability of 4
             if random.random() > 0.1:
@@ -122,131 +268,187 @@ class Board(GameElement):
                 value = 4
         new_tile = Tile(Vec(row, col), value)
         self.tiles[row][col] = new_tile
+        self._packed_rows[row] |= (value.bit_length() - 1) << (4 * col)
         self.notify_all(GameEvent(EventKind.tile_created, new_tile))
 
     def to_list(self) -> List[List[int]]:
         """Test scaffolding: represent each Tile by its
         integer value and empty positions as 0
         """
-        # same as HOWTO
-        result = []
-        for row in self.tiles:
-            row_values = []
-            for col in row:
-                if col is None:
-                    row_values.append(0)
-                else:
-                    row_values.append(col.value)
-            result.append(row_values)
-        return result
+        return [[0 if tile is None else tile.value for tile in row]
+                for row in self.tiles]
 
     def from_list(self, values: List[List[int]]):
         """Test scaffolding: set board tiles to the
         given values, where 0 represents an empty space.
+        A Tile object already at a position is reused in
+        place rather than discarded and reallocated.
         """
-        # ues nested for loop to get the every elements' index,
-        # and check every position in the list Value,
-        # if there is a 0 in the list we check, make it
-        # to 0, and if that element is not 0, we set the list into a tile by
-        # calling Tile(), and return copy it into the board, which is self.tiles.
-        # at last, return self.tiles.
+        tiles = self.tiles
+        empty = set()
+        packed_rows = self._packed_rows
         for row in range(len(values)):
+            packed = 0
             for col in range(len(values[row])):
-                if values[row][col] == 0:
-                    self.tiles[row][col] = None
+                value = values[row][col]
+                if value == 0:
+                    tiles[row][col] = None
+                    empty.add((row, col))
                 else:
-                    self.tiles[row][col] = Tile(Vec(row, col), values[row][col])
+                    tile = tiles[row][col]
+                    if tile is None:
+                        tiles[row][col] = Tile(Vec(row, col), value)
+                    else:
+                        tile.value = value
+                    packed |= (value.bit_length() - 1) << (4 * col)
+            packed_rows[row] = packed
+        self._empty = empty
         return self.tiles
 
     def in_bounds(self, pos: Vec) -> bool:
         """Is position (pos.x, pos.y) a legal position on the board?"""
-        # rows = how many list in the self.tiles.
-        # cols = how many element in a list of rows, since lists in the self.tiles all
-        # have same length, so I check the first list of self.tiles.
-        # and I let x,y get the position data from "pos" ,
-        # if each of them are greater than 0, and less than rows - 1 and cols - 1,
-        # because the len() is from 0 to start to count.
-        rows = len(self.tiles)
-        cols = len(self.tiles[0])
-        x = pos.x
-        y = pos.y
-        if 0 <= x <= rows - 1 and 0 <= y <= cols - 1:
-            return True
-        else:
-            return False
+        # A single chained-comparison expression, using the row and
+        # column counts stored at construction instead of re-measuring
+        # the grid with len() on every call.
+        return 0 <= pos.x < self.rows and 0 <= pos.y < self.cols
 
     def _move_tile(self, old_pos: Vec, new_pos: Vec):
         # copy the tile into new position.
         # let the old position in the board = None
         # tell the tile about new position
-        self.tiles[new_pos.x][new_pos.y] = self.tiles[old_pos.x][old_pos.y]
+        tile = self.tiles[old_pos.x][old_pos.y]
+        self.tiles[new_pos.x][new_pos.y] = tile
         self.tiles[old_pos.x][old_pos.y] = None
-        self[new_pos].move_to(new_pos)
+        # Mirror the move in the packed rows.  The tile's value is
+        # re-read here because a merge may just have changed it.
+        packed_rows = self._packed_rows
+        packed_rows[old_pos.x] &= ~(NIBBLE << (4 * old_pos.y))
+        shift = 4 * new_pos.y
+        packed_rows[new_pos.x] = (
+            (packed_rows[new_pos.x] & ~(NIBBLE << shift))
+            | (tile.value.bit_length() - 1) << shift)
+        self._empty.discard((new_pos.x, new_pos.y))
+        self._empty.add((old_pos.x, old_pos.y))
+        tile.move_to(new_pos)
 
     def slide(self, pos: Vec,  dir: Vec):
         """Slide tile at row,col (if any)
         in direction (dx,dy) until it bumps into
         another tile or the edge of the board.
         """
-        # same as HOWTO.md
-        if self[pos] is None:
+        tile = self[pos]
+        if tile is None:
             return
-        while True:
-            new_pos = pos + dir
-            if not self.in_bounds(new_pos):
+        # Walk the precomputed trajectory for this position and
+        # direction: no bounds checks and no Vec allocation per
+        # step, just the ray's ready-made positions.
+        tiles = self.tiles
+        cur = pos
+        for new_pos in self._rays[(pos.x, pos.y, dir.x, dir.y)]:
+            neighbor = tiles[new_pos.x][new_pos.y]
+            if neighbor is None:
+                self._move_tile(cur, new_pos)
+            elif tile == neighbor:
+                tile.merge(neighbor)
+                self._move_tile(cur, new_pos)
+                # Stop moving when we merge with another tile
                 break
-            if self[new_pos] is None:
-                self._move_tile(pos, new_pos)
-            elif self[pos] == self[new_pos]:
-                self[pos].merge(self[new_pos])
-                self._move_tile(pos, new_pos)
-                 # Stop moving when we merge with another tile
             else:
                 # Stuck against another tile
                 break
-            pos = new_pos
-
-    def right(self):
-        # loop start from the the most right element
-        # i creat two list to help me to loop in my order.
-        # in this way, i cant control which element slide first.
-        dir = Vec(0, 1)
-        row = [0, 1, 2, 3]
-        col = [3, 2, 1, 0]
-        for i in row:
-            for j in col:
-                pos = Vec(i, j)
-                self.slide(pos, dir)
-
-    def left(self):
-        # loop start from the the most left element
-        dir = Vec(0, -1)
-        row = [0, 1, 2, 3]
-        col = [0, 1, 2, 3]
-        for i in row:
-            for j in col:
-                pos = Vec(i, j)
-                self.slide(pos, dir)
-
-    def up(self):
-        # loop start from the the most top element
-        dir = Vec(-1, 0)
-        row = [0, 1, 2, 3]
-        col = [0, 1, 2, 3]
-        for i in col:
-            for j in row:
-                pos = Vec(j, i)
-                self.slide(pos, dir)
-
-    def down(self):
-        # loop start from the the deepest element
-        dir = Vec(1, 0)
-        row = [0, 1, 2, 3]
-        col = [3, 2, 1, 0]
-        for i in col:
-            for j in row:
-                pos = Vec(j, i)
-                self.slide(pos, dir)
+            cur = new_pos
+
+    def _notify_board_updated(self):
+        """One aggregate notification at the end of a whole move,
+        for listeners (score displays, automated players) that
+        would otherwise have to subscribe to every individual
+        tile.  The event carries the board itself.
+        """
+        self.notify_all(self._board_updated_event)
+
+    def _apply_action(self, old_pos: Vec, new_pos: Vec, merged: bool):
+        """Carry out one (src, dst, merged) action from
+        _slide_row_left on the Tile objects, so that listening
+        view components see the move.
+        """
+        if merged:
+            self[old_pos].merge(self[new_pos])
+        self._move_tile(old_pos, new_pos)
+
+    # The four move methods bind the action table once, at class
+    # definition time, through a defaulted parameter -- the
+    # specialize-for-the-fixed-grid trick without generating code
+    # at runtime.  Callers never pass the second argument.  Each
+    # returns True if any tile moved; a move that leaves the board
+    # unchanged produces no notifications at all.
+
+    def right(self, actions=MOVE_ACTIONS):
+        # Slide each row toward column 3: reverse the packed
+        # row, slide left, and mirror the actions back.
+        apply = self._apply_action
+        changed = False
+        for row, packed in enumerate(self._packed_rows):
+            reversed_row = (((packed & 0x000F) << 12)
+                            | ((packed & 0x00F0) << 4)
+                            | ((packed & 0x0F00) >> 4)
+                            | ((packed & 0xF000) >> 12))
+            for src, dst, merged in actions[reversed_row]:
+                apply(Vec(row, 3 - src), Vec(row, 3 - dst), merged)
+                changed = True
+        if changed:
+            self._notify_board_updated()
+        return changed
+
+    def left(self, actions=MOVE_ACTIONS):
+        # Slide each row toward column 0.
+        apply = self._apply_action
+        changed = False
+        for row, packed in enumerate(self._packed_rows):
+            for src, dst, merged in actions[packed]:
+                apply(Vec(row, src), Vec(row, dst), merged)
+                changed = True
+        if changed:
+            self._notify_board_updated()
+        return changed
+
+    def up(self, actions=MOVE_ACTIONS):
+        # Slide each column toward row 0, gathering the column's
+        # nibbles as if they were a row (top cell in the low
+        # nibble).  The row snapshots stay valid across columns
+        # because a vertical move only rewrites its own column.
+        apply = self._apply_action
+        changed = False
+        r0, r1, r2, r3 = self._packed_rows
+        for col in (0, 1, 2, 3):
+            shift = 4 * col
+            packed = (((r0 >> shift) & 0xF)
+                      | ((r1 >> shift) & 0xF) << 4
+                      | ((r2 >> shift) & 0xF) << 8
+                      | ((r3 >> shift) & 0xF) << 12)
+            for src, dst, merged in actions[packed]:
+                apply(Vec(src, col), Vec(dst, col), merged)
+                changed = True
+        if changed:
+            self._notify_board_updated()
+        return changed
+
+    def down(self, actions=MOVE_ACTIONS):
+        # Slide each column toward row 3, mirroring as in 'right'.
+        apply = self._apply_action
+        changed = False
+        r0, r1, r2, r3 = self._packed_rows
+        for col in (0, 1, 2, 3):
+            shift = 4 * col
+            packed = (((r3 >> shift) & 0xF)
+                      | ((r2 >> shift) & 0xF) << 4
+                      | ((r1 >> shift) & 0xF) << 8
+                      | ((r0 >> shift) & 0xF) << 12)
+            for src, dst, merged in actions[packed]:
+                apply(Vec(3 - src, col), Vec(3 - dst, col), merged)
+                changed = True
+        if changed:
+            self._notify_board_updated()
+        return changed
 
     def score(self) -> int:
         """
@@ -255,11 +457,32 @@ class Board(GameElement):
         based on sequence of moves rather than state of
         board.
         """
-        score = 0
-        for row in range(len(self.tiles)):
-            for col in range(len(self.tiles[row])):
-                value = self.tiles[row][col].value
-                score += value
-        return score
+        # Summing the ROW_SUM table over the maintained packed
+        # rows does the per-cell work (and treats empty cells as
+        # 0 instead of tripping over None).
+        if self.cols == 4:
+            return sum(ROW_SUM[row] for row in self._packed_rows)
+        # Odd-shaped boards can't use the 4-cell row table; sum a
+        # generator over the cells, skipping the empty ones.
+        return sum(tile.value
+                   for tile in chain.from_iterable(self.tiles)
+                   if tile is not None)
+
+    def zobrist_hash(self) -> int:
+        """A 64-bit Zobrist hash of the board position.  Boards
+        with the same tile values in the same places hash equal;
+        empty cells contribute nothing.  Intended as a
+        transposition-table key for automated players searching
+        the game tree.
+        """
+        # One flat scan over the cells, numbered row * cols + col,
+        # instead of nested loops with a per-row base offset.
+        h = 0
+        cell = 0
+        for tile in chain.from_iterable(self.tiles):
+            if tile is not None:
+                h ^= ZOBRIST_KEYS[cell][tile.value.bit_length() - 1]
+            cell += 1
+        return h
 
 
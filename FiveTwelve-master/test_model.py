@@ -51,6 +51,15 @@ class TestBoardConstructor(unittest.TestCase):
         board = model.Board()
         self.assertTrue(board.has_empty())
 
+    def test_full_board_has_no_empty(self):
+        """has_empty should be False, not None, on a full board"""
+        board = model.Board()
+        board.from_list([[2, 4, 2, 4],
+                         [4, 2, 4, 2],
+                         [2, 4, 2, 4],
+                         [4, 2, 4, 2]])
+        self.assertFalse(board.has_empty())
+
 
 class TestScaffolding(unittest.TestCase):
 
@@ -72,6 +81,17 @@ class TestScaffolding(unittest.TestCase):
         again = board.to_list()
         self.assertEqual(as_list, again)
 
+    def test_from_list_reuses_tiles(self):
+        """An occupied position keeps its Tile object"""
+        board = model.Board()
+        board.from_list([[2, 0, 0, 0], [0, 0, 0, 0],
+                         [0, 0, 0, 0], [0, 0, 0, 0]])
+        tile = board[Vec(0, 0)]
+        board.from_list([[4, 0, 0, 0], [0, 0, 0, 0],
+                         [0, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertIs(board[Vec(0, 0)], tile)
+        self.assertEqual(tile.value, 4)
+
 
 class TestBoundsCheck(unittest.TestCase):
 
@@ -250,6 +270,16 @@ class TestMove(unittest.TestCase):
                            [0, 0, 0, 4],
                            [0, 0, 4, 4]]) # Tile stops sliding when it merges
 
+    def test_noop_move_reports_unchanged(self):
+        """A move that cannot slide anything returns False"""
+        board = model.Board()
+        as_list = [[2, 4, 8, 0], [0, 0, 0, 0],
+                   [0, 0, 0, 0], [0, 0, 0, 0]]
+        board.from_list(as_list)
+        self.assertFalse(board.left())
+        self.assertEqual(board.to_list(), as_list)
+        self.assertTrue(board.right())
+
     def test_move_merge_up(self):
         board = model.Board()
         board.from_list([[4, 0, 2, 2],
@@ -266,5 +296,49 @@ class TestMove(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+class TestZobrist(unittest.TestCase):
+
+    def test_same_position_same_hash(self):
+        """The hash depends only on tile values and places"""
+        as_list = [[0, 2, 2, 4], [2, 0, 2, 8], [8, 2, 2, 4], [4, 2, 2, 0]]
+        board_a = model.Board()
+        board_a.from_list(as_list)
+        board_b = model.Board()
+        board_b.from_list(as_list)
+        self.assertEqual(board_a.zobrist_hash(), board_b.zobrist_hash())
+
+    def test_different_position_different_hash(self):
+        board_a = model.Board()
+        board_a.from_list([[2, 0, 0, 0], [0, 0, 0, 0],
+                           [0, 0, 0, 0], [0, 0, 0, 0]])
+        board_b = model.Board()
+        board_b.from_list([[4, 0, 0, 0], [0, 0, 0, 0],
+                           [0, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertNotEqual(board_a.zobrist_hash(), board_b.zobrist_hash())
+
+    def test_empty_board_hashes_zero(self):
+        """Empty cells contribute nothing to the hash"""
+        self.assertEqual(model.Board().zobrist_hash(), 0)
+
+
+class TestScore(unittest.TestCase):
+
+    def test_score_with_empties(self):
+        """Empty spaces count 0; they should not crash score"""
+        board = model.Board()
+        board.from_list([[2, 0, 4, 0],
+                         [0, 0, 0, 0],
+                         [0, 8, 0, 0],
+                         [0, 0, 0, 2]])
+        self.assertEqual(board.score(), 16)
+
+    def test_score_odd_shape(self):
+        """Scoring should also work on non-standard board shapes"""
+        board = model.Board(rows=2, cols=5)
+        board.from_list([[2, 0, 4, 0, 8],
+                         [0, 2, 0, 0, 0]])
+        self.assertEqual(board.score(), 16)
+
+
 if __name__ == "__main__":
     unittest.main()
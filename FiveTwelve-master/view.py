@@ -151,6 +151,10 @@ class GridView(game_element.GameListener):
         if event.kind == game_element.EventKind.tile_created:
             view = TileView(self, event.tile)
             event.tile.add_listener(view)
+        elif event.kind == game_element.EventKind.board_updated:
+            # The individual TileViews have already depicted the
+            # move; there is nothing more to draw at grid level.
+            pass
         else:
             raise Exception("Unexpected event: {}".format(event))
 